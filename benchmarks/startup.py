@@ -0,0 +1,77 @@
+"""Measures how long it takes to import the package and build the app.
+
+Each run happens in a fresh interpreter so import caches don't skew the
+numbers, inside a temporary directory with its own database so the log file
+and sqlite database don't end up in the working tree. Usage:
+
+    python benchmarks/startup.py            # full vs fast startup timings
+    python benchmarks/startup.py --imports  # slowest imports (python -X importtime)
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SNIPPET = """
+import time
+start = time.perf_counter()
+from grocerry import create_app
+create_app()
+print(time.perf_counter() - start)
+"""
+
+
+def run(fast, extra_args=()):
+    with tempfile.TemporaryDirectory() as workdir:
+        env = dict(
+            os.environ,
+            FAST_STARTUP='1' if fast else '0',
+            DATABASE_URL='sqlite:///' + os.path.join(workdir, 'benchmark.db'),
+            PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])),
+        )
+        return subprocess.run(
+            [sys.executable, *extra_args, '-c', SNIPPET],
+            cwd=workdir, env=env, capture_output=True, text=True, check=True,
+        )
+
+
+def time_startup(fast, repeat):
+    return [float(run(fast).stdout.strip().splitlines()[-1]) for _ in range(repeat)]
+
+
+def import_report(fast, top):
+    """Parses `-X importtime` output and returns the slowest imports by cumulative time."""
+    rows = []
+    for line in run(fast, ['-X', 'importtime']).stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--imports', action='store_true', help='print the slowest imports')
+    parser.add_argument('--top', type=int, default=20)
+    args = parser.parse_args()
+
+    for label, fast in (('full', False), ('fast', True)):
+        if args.imports:
+            print(f'{label} startup, slowest imports (cumulative us, self us, module):')
+            for cumulative, self_time, name in import_report(fast, args.top):
+                print(f'{cumulative:>10} {self_time:>10} {name}')
+            print()
+        else:
+            timings = time_startup(fast, args.repeat)
+            print(f'{label}: median {statistics.median(timings) * 1000:.1f} ms, '
+                  f'min {min(timings) * 1000:.1f} ms over {args.repeat} runs')
+
+
+if __name__ == '__main__':
+    main()
@@ -2,17 +2,27 @@ import os
 from flask import Flask, redirect, url_for
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
+from sqlalchemy import inspect
 from flask_login import LoginManager
-from flask_restful import Api
+from werkzeug.middleware.proxy_fix import ProxyFix
 import logging
+from .limits import Limiter
+from .passwords import PasswordHasher
+from .snapshot import CatalogSnapshot
 
 # Initialize extensions
 db = SQLAlchemy()
 migrate = Migrate()
+limiter = Limiter()
+hasher = PasswordHasher()
+catalog = CatalogSnapshot()
 
 # Name of the database file
 DB_NAME = 'database.db'
 
+# Flask-Migrate scripts, found regardless of the working directory
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
 def create_app():
     """Application Factory to create and configure Flask app."""
     app = Flask(__name__)
@@ -21,26 +31,54 @@ def create_app():
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
     app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///' + DB_NAME)
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['RATELIMIT_BACKEND'] = os.getenv('RATELIMIT_BACKEND', 'memory')
+    app.config['RATELIMIT_REDIS_URL'] = os.getenv('RATELIMIT_REDIS_URL')
+    app.config['THREADS'] = int(os.getenv('THREADS', 4))
+    app.config['MAX_IN_FLIGHT'] = int(os.getenv('MAX_IN_FLIGHT', app.config['THREADS']))
+    app.config['TRUSTED_PROXIES'] = int(os.getenv('TRUSTED_PROXIES', 0))
+    app.config['PASSWORD_HASH_METHOD'] = os.getenv('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    app.config['PASSWORD_HASH_WORKERS'] = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+    app.config['CATALOG_SNAPSHOT_PATH'] = os.getenv('CATALOG_SNAPSHOT_PATH')
+
+    # Fast startup trusts Flask-Migrate for the schema, loads the REST API on
+    # first use and leaves logging configuration to the server
+    fast_startup = os.getenv('FAST_STARTUP') == '1'
+    app.config['DB_CREATE_ALL'] = not fast_startup
+    app.config['LAZY_API'] = fast_startup
+    app.config['LOG_FILE'] = None if fast_startup else 'app.log'
+
+    # Trust X-Forwarded-* headers set by reverse proxies in front of the app
+    if app.config['TRUSTED_PROXIES']:
+        proxies = app.config['TRUSTED_PROXIES']
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies, x_host=proxies)
 
     # Initialize extensions
     db.init_app(app)
-    migrate.init_app(app, db)
+    migrate.init_app(app, db, directory=MIGRATIONS_DIR)
+    limiter.init_app(app)
+    hasher.init_app(app)
+    catalog.init_app(app)
 
     # Register blueprints
     from .views import views
     from .auth import auth
-    from .api import api_bp
 
     app.register_blueprint(views, url_prefix='/')
     app.register_blueprint(auth, url_prefix='/auth')
-    app.register_blueprint(api_bp, url_prefix='/api')
+
+    if app.config['LAZY_API']:
+        from .lazy import register_lazy_api
+        register_lazy_api(app, url_prefix='/api')
+    else:
+        from .api import api_bp
+        app.register_blueprint(api_bp, url_prefix='/api')
 
     # Logging setup
     setup_logging(app)
 
-    # Initialize database
-    with app.app_context():
-        db.create_all()
+    # Initialize database, unless the schema is managed with `flask db upgrade`
+    if app.config['DB_CREATE_ALL']:
+        init_database(app)
 
     # Login manager setup
     login_manager = LoginManager()
@@ -63,10 +101,44 @@ def create_app():
 
 def setup_logging(app):
     """Sets up logging for the application."""
-    logging.basicConfig(filename='app.log', level=logging.INFO)
+    if app.config['LOG_FILE']:
+        logging.basicConfig(filename=app.config['LOG_FILE'], level=logging.INFO)
     app.logger.setLevel(logging.INFO)
     app.logger.info('Application Startup')
 
+def init_database(app):
+    """Creates the tables of a new database and stamps it with the latest migration.
+
+    Databases that Flask-Migrate already tracks are left to `flask db upgrade`,
+    so the migrations never find tables created behind their back. Databases
+    from before the migrations were added are left untouched until upgraded.
+    """
+    with app.app_context():
+        inspector = inspect(db.engine)
+        tables = inspector.get_table_names()
+        if 'alembic_version' in tables:
+            return
+        if 'product' in tables and 'price' in {c['name'] for c in inspector.get_columns('product')}:
+            app.logger.error(
+                'The database uses the old schema with float prices. Upgrade it with '
+                '`flask --app app db stamp 0001` and `flask --app app db upgrade`.')
+            return
+        db.create_all()
+        if not tables:
+            stamp_head()
+
+def stamp_head():
+    """Marks the database as up to date with the latest migration.
+
+    Writes the revision directly instead of going through Flask-Migrate, whose
+    env.py reconfigures logging and would disable the app's loggers.
+    """
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+    script = ScriptDirectory(MIGRATIONS_DIR)
+    with db.engine.begin() as connection:
+        MigrationContext.configure(connection).stamp(script, 'head')
+
 def create_database(app):
     """Creates the database file if it doesn't exist."""
     if not os.path.exists('grocery/' + DB_NAME):
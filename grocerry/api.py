@@ -1,8 +1,9 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response
 from flask_restful import Resource, Api
 from marshmallow import Schema, fields, ValidationError
 from .models import Product, Category
-from . import db
+from . import db, limiter, catalog
+from .lazy import API_RESOURCES
 
 api_bp = Blueprint('api', __name__)
 api = Api(api_bp)
@@ -32,6 +33,8 @@ categories_schema = CategorySchema(many=True)
 
 # Product Resource
 class ProductResource(Resource):
+    method_decorators = [limiter.limit('api')]
+
     def get(self, product_id=None):
         try:
             if product_id:
@@ -40,6 +43,10 @@ class ProductResource(Resource):
                     return product_schema.dump(product), 200
                 return {"message": "Product not found"}, 404
 
+            snapshot = catalog.read()
+            if snapshot is not None:
+                return Response(snapshot, status=200, mimetype='application/json')
+
             products = Product.query.all()
             return products_schema.dump(products), 200
         except Exception as e:
@@ -52,6 +59,7 @@ class ProductResource(Resource):
             product = Product(**product_data)
             db.session.add(product)
             db.session.commit()
+            catalog.refresh()
             return product_schema.dump(product), 201
         except ValidationError as err:
             return {"message": "Invalid data", "errors": err.messages}, 400
@@ -69,6 +77,7 @@ class ProductResource(Resource):
             for key, value in product_data.items():
                 setattr(product, key, value)
             db.session.commit()
+            catalog.refresh()
             return product_schema.dump(product), 200
         except ValidationError as err:
             return {"message": "Invalid data", "errors": err.messages}, 400
@@ -83,6 +92,7 @@ class ProductResource(Resource):
 
             db.session.delete(product)
             db.session.commit()
+            catalog.refresh()
             return {"message": "Product deleted successfully"}, 204
         except Exception as e:
             return {"message": "Error deleting product", "error": str(e)}, 500
@@ -90,6 +100,8 @@ class ProductResource(Resource):
 
 # Category Resource
 class CategoryResource(Resource):
+    method_decorators = [limiter.limit('api')]
+
     def get(self, category_id=None):
         try:
             if category_id:
@@ -147,5 +159,5 @@ class CategoryResource(Resource):
 
 
 # Add resources to the API
-api.add_resource(ProductResource, '/api/products', '/api/products/<int:product_id>')
-api.add_resource(CategoryResource, '/api/categories', '/api/categories/<int:category_id>')
+api.add_resource(ProductResource, *API_RESOURCES['ProductResource'])
+api.add_resource(CategoryResource, *API_RESOURCES['CategoryResource'])
@@ -1,8 +1,8 @@
 from flask import Blueprint, render_template, request, flash, redirect, url_for
 from flask_login import current_user, login_user, logout_user, login_required
 from .models import User
-from . import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from . import db, limiter, hasher
+from .passwords import HasherBusy
 import re
 
 auth = Blueprint('auth', __name__)
@@ -23,6 +23,7 @@ def is_password_strong(password):
     )
 
 @auth.route('/admin-login', methods=['GET', 'POST'])
+@limiter.limit('login', methods=['POST'])
 def admin_login():
     if request.method == 'POST':
         email = request.form.get('email')
@@ -31,12 +32,15 @@ def admin_login():
         admin = User.query.filter_by(email=email, role=ADMIN_ROLE).first()
 
         if admin:
-            if check_password_hash(admin.password, password):
-                login_user(admin)
-                flash("Admin login successful!", "success")
-                return redirect(url_for('views.admin_dashboard'))
-            else:
-                flash("Invalid password.", "error")
+            try:
+                if hasher.verify(admin, password):
+                    login_user(admin)
+                    flash("Admin login successful!", "success")
+                    return redirect(url_for('views.admin_dashboard'))
+                else:
+                    flash("Invalid password.", "error")
+            except HasherBusy:
+                flash("Server is busy. Please try again in a moment.", "warning")
         else:
             flash("No admin user found with that email.", "error")
 
@@ -44,6 +48,7 @@ def admin_login():
 
 
 @auth.route('/user-login', methods=['GET', 'POST'])
+@limiter.limit('login', methods=['POST'])
 def user_login():
     if request.method == 'POST':
         email = request.form.get('email')
@@ -59,13 +64,16 @@ def user_login():
             flash("Admins should use the admin login page.", "warning")
             return redirect(url_for('auth.admin_login'))
 
-        if check_password_hash(user.password, password):
-            login_user(user)
-            flash("User logged in successfully!", "success")
-            next_page = request.args.get('next')
-            return redirect(next_page or url_for('views.user_dashboard'))
-        else:
-            flash("Invalid email or password.", "error")
+        try:
+            if hasher.verify(user, password):
+                login_user(user)
+                flash("User logged in successfully!", "success")
+                next_page = request.args.get('next')
+                return redirect(next_page or url_for('views.user_dashboard'))
+            else:
+                flash("Invalid email or password.", "error")
+        except HasherBusy:
+            flash("Server is busy. Please try again in a moment.", "warning")
 
     return render_template('user_login.html')
 
@@ -96,7 +104,11 @@ def signup():
         if existing_user:
             flash("An account with this email already exists.", "error")
         else:
-            hashed_password = generate_password_hash(password)
+            try:
+                hashed_password = hasher.hash(password)
+            except HasherBusy:
+                flash("Server is busy. Please try again in a moment.", "warning")
+                return redirect(url_for('auth.signup'))
             new_user = User(name=name, email=email, password=hashed_password, role=role)
             db.session.add(new_user)
             db.session.commit()
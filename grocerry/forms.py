@@ -1,5 +1,5 @@
 from flask_wtf import FlaskForm
-from wtforms import StringField, FloatField, FileField, SelectField, TextAreaField, DateField, IntegerField
+from wtforms import StringField, DecimalField, FileField, SelectField, TextAreaField, DateField, IntegerField
 from wtforms.validators import DataRequired, Length, NumberRange, Optional, ValidationError
 from flask_wtf.file import FileAllowed
 
@@ -13,8 +13,9 @@ class ProductForm(FlaskForm):
             Length(max=100, message="Product name must not exceed 100 characters.")
         ]
     )
-    price = FloatField(
+    price = DecimalField(
         'Price',
+        places=2,
         validators=[
             DataRequired(message="Price is required."),
             NumberRange(min=0, message="Price must be a positive value.")
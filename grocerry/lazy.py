@@ -0,0 +1,45 @@
+from werkzeug.utils import cached_property, import_string
+
+# URL rules of each REST resource, relative to the /api prefix
+API_RESOURCES = {
+    'ProductResource': ('/api/products', '/api/products/<int:product_id>'),
+    'CategoryResource': ('/api/categories', '/api/categories/<int:category_id>'),
+}
+
+API_METHODS = ['GET', 'POST', 'PUT', 'DELETE']
+
+
+class LazyResource:
+    """View for a REST resource that imports the API module on first hit.
+
+    flask_restful and marshmallow are only imported when an API route is
+    actually requested, which keeps them out of worker and CLI startup.
+    """
+
+    def __init__(self, name):
+        self.endpoint = name.lower()
+        self.import_name = 'grocerry.api.' + name
+
+    @cached_property
+    def view(self):
+        from .api import api
+        resource = import_string(self.import_name)
+        return api.output(resource.as_view(self.endpoint))
+
+    def __call__(self, *args, **kwargs):
+        try:
+            return self.view(*args, **kwargs)
+        except Exception as e:
+            # The API blueprint isn't registered in this mode, so route errors
+            # through flask_restful like it would, keeping JSON error responses
+            from .api import api
+            return api.handle_error(e)
+
+
+def register_lazy_api(app, url_prefix):
+    """Adds the API routes to the app without importing the API blueprint."""
+    for name, urls in API_RESOURCES.items():
+        view = LazyResource(name)
+        for url in urls:
+            app.add_url_rule(url_prefix + url, endpoint='api.' + view.endpoint,
+                             view_func=view, methods=API_METHODS)
@@ -0,0 +1,241 @@
+import math
+import threading
+import time
+from functools import wraps
+from flask import current_app, request, jsonify
+from flask_login import current_user
+from werkzeug.utils import import_string
+
+
+# Default (rate per second, burst) for each route class
+DEFAULT_RULES = {
+    'api': (20.0, 40),
+    'login': (0.2, 5),
+}
+
+
+class MemoryBackend:
+    """Token buckets kept in process memory. Each worker has its own buckets."""
+
+    # Seconds between sweeps that drop buckets which have refilled completely
+    PRUNE_INTERVAL = 60
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._last_prune = time.monotonic()
+
+    def take(self, key, rate, burst):
+        """Takes one token from the bucket. Returns seconds to wait, 0 if allowed."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_prune >= self.PRUNE_INTERVAL:
+                self._prune(now)
+            tokens, stamp, _ = self._buckets.get(key, (burst, now, now))
+            tokens = min(burst, tokens + (now - stamp) * rate)
+            wait = 0 if tokens >= 1 else (1 - tokens) / rate
+            if not wait:
+                tokens -= 1
+            # A bucket is full again, and identical to a missing one, at full_at
+            full_at = now + (burst - tokens) / rate
+            self._buckets[key] = (tokens, now, full_at)
+            return wait
+
+    def _prune(self, now):
+        self._buckets = {key: bucket for key, bucket in self._buckets.items() if bucket[2] > now}
+        self._last_prune = now
+
+
+class RedisBackend:
+    """Token buckets shared by all workers through Redis."""
+
+    SCRIPT = """
+    local rate = tonumber(ARGV[1])
+    local burst = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'stamp')
+    local tokens = tonumber(state[1]) or burst
+    local stamp = tonumber(state[2]) or now
+    tokens = math.min(burst, tokens + (now - stamp) * rate)
+    local wait = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+    else
+        wait = (1 - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'stamp', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+    return tostring(wait)
+    """
+
+    def __init__(self, url=None):
+        import redis  # Optional dependency, only needed for this backend
+        self._client = redis.Redis.from_url(url or 'redis://localhost:6379/0')
+        self._script = self._client.register_script(self.SCRIPT)
+
+    def take(self, key, rate, burst):
+        return float(self._script(keys=['ratelimit:' + key], args=[rate, burst, time.time()]))
+
+
+class Limiter:
+    """Per-client token-bucket rate limiting plus global admission control."""
+
+    def __init__(self, app=None):
+        self.backend = None
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._pool_slow_until = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('RATELIMIT_ENABLED', True)
+        app.config.setdefault('RATELIMIT_BACKEND', 'memory')
+        app.config.setdefault('RATELIMIT_REDIS_URL', None)
+        app.config.setdefault('RATELIMIT_RULES', DEFAULT_RULES)
+        threads = app.config.get('THREADS', 4)
+        # Per-worker concurrency cap, defaults to the number of request threads
+        app.config.setdefault('MAX_IN_FLIGHT', threads)
+        # Requests accepted by the worker but not finished, reported by gunicorn
+        app.config.setdefault('MAX_WORKER_BACKLOG', 2 * threads)
+        # Seconds since the proxy received the request (X-Request-Start)
+        app.config.setdefault('MAX_QUEUE_TIME', 1.0)
+        # Seconds spent waiting for a database connection
+        app.config.setdefault('MAX_DB_POOL_WAIT', 0.1)
+        app.config.setdefault('SHED_RETRY_AFTER', 1)
+
+        backend = app.config['RATELIMIT_BACKEND']
+        if backend == 'memory':
+            self.backend = MemoryBackend()
+        elif backend == 'redis':
+            self.backend = RedisBackend(app.config['RATELIMIT_REDIS_URL'])
+        elif isinstance(backend, str):
+            self.backend = import_string(backend)()
+        else:
+            self.backend = backend
+
+        app.before_request(self._admit)
+        app.teardown_request(self._release)
+
+    def limit(self, route_class, methods=None):
+        """Decorator that rate limits a view by client and route class."""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if methods is None or request.method in methods:
+                    wait = self.check(route_class)
+                    if wait:
+                        return too_many_requests(wait)
+                return view(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def check(self, route_class):
+        """Returns seconds until the client may retry, or 0 if the request is allowed."""
+        if not current_app.config['RATELIMIT_ENABLED']:
+            return 0
+        rate, burst = current_app.config['RATELIMIT_RULES'][route_class]
+        return self.backend.take(f'{route_class}:{client_key()}', rate, burst)
+
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+    def _admit(self):
+        """Sheds load before any work is done when the worker is saturated."""
+        with self._lock:
+            admitted = not self._overloaded()
+            if admitted:
+                self._in_flight += 1
+        if not admitted:
+            current_app.logger.warning('Shedding request to %s: server overloaded.', request.path)
+            response = jsonify({"message": "Server is busy, please retry"})
+            response.status_code = 503
+            response.headers['Retry-After'] = str(current_app.config['SHED_RETRY_AFTER'])
+            return response
+        request.environ['grocerry.admitted'] = True
+
+    def _release(self, exc=None):
+        if request.environ.pop('grocerry.admitted', False):
+            with self._lock:
+                self._in_flight -= 1
+
+    def _overloaded(self):
+        """Checks whether requests are piling up in front of this worker.
+
+        Looks at the requests running in the app, the worker's backlog as
+        reported by the gunicorn pre_request hook, the time spent queued since
+        a trusted proxy received the request, and recent waits for a database
+        connection.
+        """
+        config = current_app.config
+        if self._in_flight >= config['MAX_IN_FLIGHT']:
+            return True
+        backlog = request.headers.get('X-Worker-Backlog', type=int)
+        if backlog is not None and backlog > config['MAX_WORKER_BACKLOG']:
+            return True
+        if config.get('TRUSTED_PROXIES'):
+            queue_time = request_queue_time()
+            if queue_time is not None and queue_time > config['MAX_QUEUE_TIME']:
+                return True
+        self._watch_pool()
+        return time.monotonic() < self._pool_slow_until
+
+    def _watch_pool(self):
+        """Times connection checkouts from the current pool of the engine.
+
+        The pool is replaced when the engine is disposed (e.g. after forking),
+        so the wrapper is installed on whichever pool is current.
+        """
+        from . import db
+        pool = db.engine.pool
+        if getattr(pool, '_grocerry_timed', False):
+            return
+        connect = pool.connect
+        max_wait = current_app.config['MAX_DB_POOL_WAIT']
+        hold = current_app.config['SHED_RETRY_AFTER']
+
+        def timed_connect():
+            start = time.monotonic()
+            connection = connect()
+            now = time.monotonic()
+            if now - start > max_wait:
+                # Shed new requests for a while, until checkouts are fast again
+                self._pool_slow_until = now + hold
+            return connection
+
+        pool.connect = timed_connect
+        pool._grocerry_timed = True
+
+
+def client_key():
+    """Identifies the client: the logged in user, otherwise the remote address."""
+    if current_user and current_user.is_authenticated:
+        return f'user:{current_user.id}'
+    return f'ip:{request.remote_addr}'
+
+
+def request_queue_time():
+    """Seconds since the proxy stamped X-Request-Start, or None without the header.
+
+    Accepts the common 't=<seconds|milliseconds|microseconds>' formats.
+    """
+    value = request.headers.get('X-Request-Start', '').strip()
+    if value.startswith('t='):
+        value = value[2:]
+    try:
+        start = float(value)
+    except ValueError:
+        return None
+    if start > 1e14:
+        start /= 1e6
+    elif start > 1e11:
+        start /= 1e3
+    return time.time() - start
+
+
+def too_many_requests(wait):
+    response = jsonify({"message": "Too many requests, please slow down"})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(max(1, math.ceil(wait)))
+    return response
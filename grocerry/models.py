@@ -1,13 +1,14 @@
 from . import db
 from flask_login import UserMixin
 from datetime import datetime, timezone
+from .money import to_cents, from_cents
 
 # User Table
 class User(db.Model, UserMixin):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(50), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    password = db.Column(db.String(60), nullable=False)
+    password = db.Column(db.String(255), nullable=False)
     role = db.Column(db.String(20), default='customer')  # customer or admin
     carts = db.relationship('Cart', backref='user', lazy=True, cascade="all, delete")
     orders = db.relationship('Order', backref='user', lazy=True, cascade="all, delete")
@@ -18,7 +19,7 @@ class Product(db.Model):
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=True)
     category = db.Column(db.String(50), nullable=False)
-    price = db.Column(db.Float, nullable=False)
+    price_cents = db.Column(db.Integer, nullable=False)
     image = db.Column(db.String(255), nullable=True)
     manufacture_date = db.Column(db.Date, nullable=True)
     expiry_date = db.Column(db.Date, nullable=True)
@@ -26,35 +27,57 @@ class Product(db.Model):
     carts = db.relationship('Cart', backref='product', lazy=True, cascade="all, delete")
     order_items = db.relationship('OrderItem', backref='product', lazy=True, cascade="all, delete")
 
+    @property
+    def price(self):
+        return from_cents(self.price_cents)
+
+    @price.setter
+    def price(self, value):
+        self.price_cents = to_cents(value)
+
 # Cart Table
 class Cart(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
     quantity = db.Column(db.Integer, nullable=False, default=1)
-    total_price = db.Column(db.Float, nullable=False)  
 
     # Constraints for unique cart items per user
     __table_args__ = (
         db.UniqueConstraint('user_id', 'product_id', name='unique_cart_item'),
     )
 
+    @classmethod
+    def total_cents_for_user(cls, user_id):
+        """Sums the user's cart at current product prices in a single query."""
+        return db.session.query(
+            db.func.coalesce(db.func.sum(cls.quantity * Product.price_cents), 0)
+        ).join(Product, cls.product_id == Product.id).filter(cls.user_id == user_id).scalar()
+
 # Order Table
 class Order(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     order_date = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
-    total_amount = db.Column(db.Float, nullable=False) 
+    total_amount_cents = db.Column(db.Integer, nullable=False)
     status = db.Column(db.String(20), default='Pending')  
     order_items = db.relationship('OrderItem', backref='order', lazy=True, cascade="all, delete")
 
+    @property
+    def total_amount(self):
+        return from_cents(self.total_amount_cents)
+
 # Order Item Table
 class OrderItem(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=False)
     product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
     quantity = db.Column(db.Integer, nullable=False, default=1)
-    item_price = db.Column(db.Float, nullable=False)  # Derived field: product.price * quantity
+    item_price_cents = db.Column(db.Integer, nullable=False)  # Unit price at the time of purchase
+
+    @property
+    def item_price(self):
+        return from_cents(self.item_price_cents)
 
 # Category Table (Optional, for managing categories separately)
 class Category(db.Model):
@@ -80,7 +103,11 @@ class Payment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=False)
     payment_date = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
-    amount = db.Column(db.Float, nullable=False)
+    amount_cents = db.Column(db.Integer, nullable=False)
     payment_method = db.Column(db.String(50), nullable=False)  # e.g., Credit Card, PayPal, Stripe
     status = db.Column(db.String(20), default='Completed')  # Pending, Completed, Failed
     order = db.relationship('Order', backref='payment', lazy=True)
+
+    @property
+    def amount(self):
+        return from_cents(self.amount_cents)
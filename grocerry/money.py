@@ -0,0 +1,14 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+# Prices are stored as integer cents so sums in SQL and in Python are exact
+CENT = Decimal('0.01')
+
+
+def to_cents(amount):
+    """Converts an amount in currency units (e.g. 12.5 or '12.50') to integer cents."""
+    return int((Decimal(str(amount)) / CENT).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def from_cents(cents):
+    """Converts integer cents to a Decimal amount in currency units."""
+    return (Decimal(cents or 0) * CENT).quantize(CENT)
@@ -0,0 +1,124 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class HasherBusy(Exception):
+    """Raised when too many password hashes are already queued."""
+
+
+class PasswordHasher:
+    """Hashes and verifies passwords on a bounded thread pool.
+
+    Hashing is CPU heavy and each job blocks the request thread waiting for
+    it, so only part of the worker's request threads may be hashing at once;
+    the rest stay free for other requests. Stored hashes using outdated
+    parameters are replaced on the next successful login.
+    """
+
+    def __init__(self, app=None):
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+        self._method_prefixes = {}
+        self.queued = 0
+        self.max_queued_seen = 0
+        self.rejected = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        # Werkzeug method string, e.g. 'scrypt:32768:8:1' or 'pbkdf2:sha256:600000'
+        app.config.setdefault('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+        app.config.setdefault('PASSWORD_SALT_LENGTH', 16)
+        app.config.setdefault('PASSWORD_HASH_WORKERS', 2)
+        # Hashing jobs allowed at once (running or waiting), at most half the request threads
+        app.config.setdefault('PASSWORD_HASH_MAX_PENDING', max(1, app.config.get('THREADS', 4) // 2))
+        app.config.setdefault('PASSWORD_HASH_TIMEOUT', 10)
+
+    def hash(self, password):
+        method = current_app.config['PASSWORD_HASH_METHOD']
+        salt_length = current_app.config['PASSWORD_SALT_LENGTH']
+        return self._run(generate_password_hash, password, method, salt_length)
+
+    def verify(self, user, password):
+        """Checks the password and upgrades the stored hash if it is outdated."""
+        if not self._run(check_password_hash, user.password, password):
+            return False
+        if self.needs_rehash(user.password):
+            try:
+                new_hash = self.hash(password)
+            except HasherBusy:
+                current_app.logger.info('Skipped rehashing password for user %s, hasher busy.', user.id)
+            else:
+                from . import db
+                user.password = new_hash
+                db.session.commit()
+                current_app.logger.info('Rehashed password for user %s.', user.id)
+        return True
+
+    def needs_rehash(self, password_hash):
+        return password_hash.split('$', 1)[0] != self._method_prefix()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'queued': self.queued,
+                'max_queued_seen': self.max_queued_seen,
+                'rejected': self.rejected,
+            }
+
+    def _method_prefix(self):
+        """Returns the configured method as werkzeug writes it into hashes.
+
+        Short forms such as 'scrypt' or 'pbkdf2:sha256' are expanded with
+        werkzeug's defaults, so the prefix is taken from a real hash. This is
+        done once per method, on first use, to keep it out of app startup.
+        """
+        method = current_app.config['PASSWORD_HASH_METHOD']
+        if method not in self._method_prefixes:
+            prefix = generate_password_hash('', method, salt_length=1).split('$', 1)[0]
+            self._method_prefixes[method] = prefix
+        return self._method_prefixes[method]
+
+    def _run(self, func, *args):
+        executor = self._get_executor()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            current_app.logger.warning('Password hashing queue is full, rejecting request.')
+            raise HasherBusy()
+        with self._lock:
+            self.queued += 1
+            self.max_queued_seen = max(self.max_queued_seen, self.queued)
+        try:
+            future = executor.submit(func, *args)
+        except Exception:
+            self._release()
+            raise
+        # The slot is held until the job finishes, even if the caller stops waiting
+        future.add_done_callback(lambda _: self._release())
+        try:
+            return future.result(current_app.config['PASSWORD_HASH_TIMEOUT'])
+        except TimeoutError:
+            current_app.logger.warning('Timed out waiting for password hashing.')
+            raise HasherBusy()
+
+    def _release(self):
+        with self._lock:
+            self.queued -= 1
+        self._slots.release()
+
+    def _get_executor(self):
+        # Created on first use so forked workers don't inherit the pool's threads
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    config = current_app.config
+                    max_pending = config['PASSWORD_HASH_MAX_PENDING']
+                    self._slots = threading.BoundedSemaphore(max_pending)
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=min(config['PASSWORD_HASH_WORKERS'], max_pending),
+                        thread_name_prefix='password-hash')
+        return self._executor
@@ -0,0 +1,84 @@
+import fcntl
+import mmap
+import os
+import tempfile
+import threading
+from flask import current_app
+
+
+class CatalogSnapshot:
+    """Read-only product list shared by all worker processes.
+
+    The serialized product list is written once to a file and memory mapped
+    by every worker, so the data lives in the shared page cache instead of
+    in each process. Writers replace the file atomically and readers remap
+    it when they notice a new file.
+    """
+
+    def __init__(self, app=None):
+        self.path = None
+        self._map = None
+        self._inode = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('CATALOG_SNAPSHOT_PATH', None)
+        self.path = app.config['CATALOG_SNAPSHOT_PATH']
+
+    @property
+    def enabled(self):
+        return self.path is not None
+
+    def refresh(self):
+        """Serializes the current product list and publishes it to all workers.
+
+        Failures are logged rather than raised: the snapshot is refreshed after
+        product writes have been committed, and those must not be reported as
+        failed because of it.
+        """
+        if not self.enabled:
+            return
+        try:
+            self._write()
+        except Exception:
+            from . import db
+            db.session.rollback()
+            current_app.logger.exception('Failed to write catalog snapshot.')
+
+    def _write(self):
+        from .api import products_schema
+        from .models import Product
+        directory = os.path.dirname(os.path.abspath(self.path))
+        # Serialize query and replace across workers, so an older read can't
+        # replace the file after a newer one
+        with open(self.path + '.lock', 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            data = products_schema.dumps(Product.query.all()).encode('utf-8')
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.catalog-')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, self.path)
+            except Exception:
+                os.unlink(tmp_path)
+                raise
+        current_app.logger.info('Catalog snapshot written (%d bytes).', len(data))
+
+    def read(self):
+        """Returns the serialized product list, or None if there is no snapshot."""
+        if not self.enabled:
+            return None
+        try:
+            inode = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            if inode != self._inode:
+                with open(self.path, 'rb') as f:
+                    new_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                if self._map is not None:
+                    self._map.close()
+                self._map, self._inode = new_map, inode
+            return self._map[:]
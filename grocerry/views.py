@@ -1,13 +1,14 @@
-from flask import Blueprint, render_template, request, flash, redirect, url_for, current_app
+from flask import Blueprint, render_template, request, flash, redirect, url_for, current_app, jsonify
 from flask_login import current_user, login_user, logout_user, login_required
 from werkzeug.utils import secure_filename
 from sqlalchemy import or_
+from sqlalchemy.orm import joinedload
 import os
 import secrets
 from datetime import datetime
-from . import db
-from .forms import ProductForm
+from . import db, catalog, hasher, limiter
 from .models import Product, Order, OrderItem, User, Cart
+from .money import from_cents
 
 views = Blueprint('views', __name__)
 
@@ -59,6 +60,7 @@ def add_product():
         flash("Access restricted to admins only.", "error")
         return redirect(url_for('views.home'))
 
+    from .forms import ProductForm
     form = ProductForm()
     if form.validate_on_submit():
         try:
@@ -74,6 +76,7 @@ def add_product():
             )
             db.session.add(product)
             db.session.commit()
+            catalog.refresh()
             flash("Product added successfully!", "success")
             return redirect(url_for('views.admin_dashboard'))
         except Exception as e:
@@ -91,6 +94,7 @@ def edit_product(product_id):
         return redirect(url_for('views.home'))
 
     product = Product.query.get_or_404(product_id)
+    from .forms import ProductForm
     form = ProductForm(obj=product)
 
     if form.validate_on_submit():
@@ -103,6 +107,7 @@ def edit_product(product_id):
                 product.image = image_name
 
             db.session.commit()
+            catalog.refresh()
             flash("Product updated successfully!", "success")
             return redirect(url_for('views.admin_dashboard'))
         except Exception as e:
@@ -123,6 +128,7 @@ def delete_product(product_id):
         product = Product.query.get_or_404(product_id)
         db.session.delete(product)
         db.session.commit()
+        catalog.refresh()
         flash("Product deleted successfully!", "success")
     except Exception as e:
         db.session.rollback()
@@ -130,6 +136,16 @@ def delete_product(product_id):
     return redirect(url_for('views.admin_dashboard'))
 
 
+@views.route('/admin-metrics', methods=['GET'])
+@login_required
+def admin_metrics():
+    """Load indicators of the worker that serves the request."""
+    if current_user.role != 'adminRole':
+        flash("Access restricted to admins only.", "error")
+        return redirect(url_for('views.home'))
+    return jsonify(in_flight=limiter.in_flight, password_hashing=hasher.stats())
+
+
 @views.route('/user-dashboard', methods=['GET'])
 @login_required
 def user_dashboard():
@@ -158,13 +174,11 @@ def add_to_cart():
 
         if cart_item:
             cart_item.quantity += quantity
-            cart_item.total_price = cart_item.product.price * cart_item.quantity
         else:
             cart_item = Cart(
                 user_id=current_user.id,
                 product_id=product_id,
-                quantity=quantity,
-                total_price=product.price * quantity
+                quantity=quantity
             )
             db.session.add(cart_item)
 
@@ -181,8 +195,8 @@ def add_to_cart():
 @login_required
 def cart():
     try:
-        cart_items = Cart.query.filter_by(user_id=current_user.id).all()
-        total_price = sum(item.product.price * item.quantity for item in cart_items)
+        cart_items = Cart.query.options(joinedload(Cart.product)).filter_by(user_id=current_user.id).all()
+        total_price = from_cents(Cart.total_cents_for_user(current_user.id))
         return render_template('cart.html', cart_items=cart_items, total_price=total_price)
     except Exception as e:
         flash("Error loading cart. Please try again.", "error")
@@ -193,23 +207,23 @@ def cart():
 @login_required
 def buy():
     try:
-        cart_items = Cart.query.filter_by(user_id=current_user.id).all()
+        cart_items = Cart.query.options(joinedload(Cart.product)).filter_by(user_id=current_user.id).all()
 
         if not cart_items:
             flash("Your cart is empty.", "warning")
             return redirect(url_for('views.cart'))
 
-        total_amount = sum(item.total_price for item in cart_items)
-        order = Order(user_id=current_user.id, order_date=datetime.utcnow(), total_amount=total_amount)
+        total_amount_cents = Cart.total_cents_for_user(current_user.id)
+        order = Order(user_id=current_user.id, order_date=datetime.utcnow(), total_amount_cents=total_amount_cents)
 
         db.session.add(order)
 
         for cart_item in cart_items:
             order_item = OrderItem(
-                order_id=order.id,
+                order=order,
                 product_id=cart_item.product_id,
                 quantity=cart_item.quantity,
-                item_price=cart_item.product.price
+                item_price_cents=cart_item.product.price_cents
             )
             db.session.add(order_item)
             db.session.delete(cart_item)
@@ -0,0 +1,38 @@
+import multiprocessing
+import os
+
+# Production server settings, run with: gunicorn -c gunicorn.conf.py
+wsgi_app = 'wsgi:app'
+bind = os.getenv('BIND', '0.0.0.0:8080')
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('THREADS', 4))
+
+# Import the app once in the master so workers share its memory. Workers are
+# then forked from the master's copy of the code, so SIGHUP only restarts them
+# and a deploy needs a new master (SIGUSR2, then SIGQUIT the old one).
+# Set PRELOAD_APP=0 to make SIGHUP load new code, at the cost of each worker
+# importing the app separately.
+preload_app = os.getenv('PRELOAD_APP', '1') == '1'
+
+# Recycle workers after a number of requests to bound memory growth
+max_requests = int(os.getenv('MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('MAX_REQUESTS_JITTER', 100))
+
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+
+
+def post_fork(server, worker):
+    """Drops database connections inherited from the master process."""
+    from wsgi import app
+    from grocerry import db
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+
+def pre_request(worker, req):
+    """Tells the app how many requests this worker has accepted but not finished."""
+    backlog = len(getattr(worker, 'futures', ()))
+    req.headers = [(name, value) for name, value in req.headers if name != 'X-WORKER-BACKLOG']
+    req.headers.append(('X-WORKER-BACKLOG', str(backlog)))
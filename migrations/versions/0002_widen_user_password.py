@@ -0,0 +1,28 @@
+"""Widen user password column for scrypt hashes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 16:40:27.516204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user') as batch_op:
+        batch_op.alter_column('password', existing_type=sa.String(length=60),
+                              type_=sa.String(length=255), existing_nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('user') as batch_op:
+        batch_op.alter_column('password', existing_type=sa.String(length=255),
+                              type_=sa.String(length=60), existing_nullable=False)
@@ -0,0 +1,79 @@
+"""Store money as integer cents
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 16:45:12.381904
+
+"""
+from decimal import Decimal, ROUND_HALF_UP
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+# (table, old float column, new integer cents column)
+MONEY_COLUMNS = [
+    ('product', 'price', 'price_cents'),
+    ('order', 'total_amount', 'total_amount_cents'),
+    ('order_item', 'item_price', 'item_price_cents'),
+    ('payment', 'amount', 'amount_cents'),
+]
+
+
+def to_cents(amount):
+    # Same rounding as grocerry.money.to_cents, so migrated rows match new ones
+    return int((Decimal(str(amount)) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def upgrade():
+    for table_name, old, new in MONEY_COLUMNS:
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.add_column(sa.Column(new, sa.Integer(), nullable=True))
+
+        table = sa.table(table_name, sa.column('id', sa.Integer),
+                         sa.column(old, sa.Float), sa.column(new, sa.Integer))
+        connection = op.get_bind()
+        rows = connection.execute(sa.select(table.c.id, table.c[old])).fetchall()
+        if rows:
+            connection.execute(
+                table.update().where(table.c.id == sa.bindparam('row_id')).values({new: sa.bindparam('cents')}),
+                [{'row_id': row_id, 'cents': to_cents(amount)} for row_id, amount in rows],
+            )
+
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.alter_column(new, existing_type=sa.Integer(), nullable=False)
+            batch_op.drop_column(old)
+
+    # Cart totals are now computed from current product prices
+    with op.batch_alter_table('cart') as batch_op:
+        batch_op.drop_column('total_price')
+
+
+def downgrade():
+    with op.batch_alter_table('cart') as batch_op:
+        batch_op.add_column(sa.Column('total_price', sa.Float(), nullable=True))
+
+    cart = sa.table('cart', sa.column('product_id', sa.Integer), sa.column('quantity', sa.Integer),
+                    sa.column('total_price', sa.Float))
+    product = sa.table('product', sa.column('id', sa.Integer), sa.column('price_cents', sa.Integer))
+    unit_price_cents = sa.select(product.c.price_cents).where(product.c.id == cart.c.product_id).scalar_subquery()
+    op.execute(cart.update().values(total_price=unit_price_cents * cart.c.quantity / 100.0))
+
+    with op.batch_alter_table('cart') as batch_op:
+        batch_op.alter_column('total_price', existing_type=sa.Float(), nullable=False)
+
+    for table_name, old, new in reversed(MONEY_COLUMNS):
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.add_column(sa.Column(old, sa.Float(), nullable=True))
+
+        table = sa.table(table_name, sa.column(old, sa.Float), sa.column(new, sa.Integer))
+        op.execute(table.update().values({old: table.c[new] / 100.0}))
+
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.alter_column(old, existing_type=sa.Float(), nullable=False)
+            batch_op.drop_column(new)
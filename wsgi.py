@@ -0,0 +1,7 @@
+from grocerry import create_app, catalog
+
+# Loaded once in the gunicorn master (preload_app) and shared by forked workers
+app = create_app()
+
+with app.app_context():
+    catalog.refresh()